@@ -26,15 +26,16 @@ Pre-registration date: 2026-02-09
 """
 
 import json
+import math
 import sys
 import os
-import glob
+import functools
 import numpy as np
+import pandas as pd
 from scipy import stats
-from collections import defaultdict
 
 try:
-    from statsmodels.stats.contingency_tables import mcnemar
+    from statsmodels.stats.contingency_tables import mcnemar as mcnemar_test
     from statsmodels.stats.multitest import multipletests
     HAS_STATSMODELS = True
 except ImportError:
@@ -42,14 +43,82 @@ except ImportError:
     print("Install with: pip install statsmodels")
     HAS_STATSMODELS = False
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Per-case fields extracted from the results file
+CASE_DTYPE = np.dtype([
+    ("llmRating", np.float64),
+    ("ssrRating", np.float64),
+    ("targetRating", np.int64),
+    ("ssrConfidence", np.float64),
+    ("personaId", object),
+    ("domain", object),
+])
+
+# Significance tiers: p < 0.001, < 0.01, < 0.05, otherwise ns
+_SIG_LEVELS = np.array([0.001, 0.01, 0.05])
+_SIG_LABELS = ("***", "**", "*", "ns")
+
+
+@functools.lru_cache(maxsize=1)
+def _list_data_dir(data_dir: str) -> tuple[str, ...]:
+    """List non-partial JSON files in data dir (scanned once per run)."""
+    try:
+        with os.scandir(data_dir) as it:
+            return tuple(entry.name for entry in it
+                         if entry.name.endswith(".json") and "partial" not in entry.name)
+    except FileNotFoundError:
+        return ()
+
 
 def find_latest_file(data_dir: str, prefix: str) -> str | None:
     """Find the most recent file matching a prefix in data dir."""
-    pattern = os.path.join(data_dir, f"{prefix}*.json")
-    files = sorted(glob.glob(pattern), reverse=True)
-    # Filter out partial files
-    files = [f for f in files if "partial" not in f]
-    return files[0] if files else None
+    # Filenames end in a millisecond timestamp, so lexicographic max == latest
+    latest = max((name for name in _list_data_dir(data_dir) if name.startswith(prefix)), default=None)
+    return os.path.join(data_dir, latest) if latest else None
+
+
+def load_json(path: str):
+    """Load a JSON file, using orjson when available (faster parse)."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity literals; the stdlib parser accepts them
+            pass
+    return json.loads(raw)
+
+
+def _numpy_default(obj):
+    """JSON `default` hook for numpy scalars and arrays."""
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dump_json(obj, path: str):
+    """Write JSON with 2-space indent, serializing numpy values via `default`.
+    Always uses the stdlib encoder so non-finite floats (e.g. an infinite odds
+    ratio) are written as Infinity/NaN rather than orjson's null.
+    """
+    with open(path, "w") as f:
+        json.dump(obj, f, indent=2, default=_numpy_default)
+
+
+def _find_h3(ablation_data: dict) -> dict | None:
+    """Find the H3 (asymmetric) condition, which matches our SSR config."""
+    # Ablation v2 uses "conditions" with "details" per case
+    for cond in ablation_data.get("conditions", ablation_data.get("variants", [])):
+        name = cond.get("name", "")
+        if "H3" in name or "asymm" in name.lower() or "asymmetric" in name.lower():
+            return cond
+    return None
 
 
 def rank_biserial(w_stat: float, n: int) -> float:
@@ -62,6 +131,28 @@ def rank_biserial(w_stat: float, n: int) -> float:
     return 1 - (2 * w_stat) / max_w
 
 
+def paired_contingency(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Build the 2×2 McNemar table from paired boolean outcomes.
+    Rows: first correct/incorrect; cols: second correct/incorrect.
+    """
+    # Encode each pair as first*2 + second: 3 = both correct, 2 = first only,
+    # 1 = second only, 0 = both wrong — reversed, the counts are the table row-major.
+    codes = first.astype(np.int8) * 2 + second.astype(np.int8)
+    return np.bincount(codes, minlength=4)[::-1].reshape(2, 2)
+
+
+def group_mean_sd(sorted_values: np.ndarray, offsets: np.ndarray,
+                  counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Mean and population SD of contiguous groups in a pre-sorted array.
+    Groups start at `offsets` and must all be non-empty.
+    """
+    sums = np.add.reduceat(sorted_values, offsets)
+    sq_sums = np.add.reduceat(sorted_values * sorted_values, offsets)
+    means = sums / counts
+    sds = np.sqrt(np.maximum(sq_sums / counts - means * means, 0.0))
+    return means, sds
+
+
 def print_separator(char: str = "=", width: int = 75):
     print(char * width)
 
@@ -70,7 +161,8 @@ def print_test_result(name: str, stat_name: str, stat_val: float,
                       p_raw: float, p_adj: float | None, effect_name: str,
                       effect_val: float, reject: bool | None, extra: str = ""):
     """Format and print a statistical test result."""
-    sig = "***" if (p_adj or p_raw) < 0.001 else "**" if (p_adj or p_raw) < 0.01 else "*" if (p_adj or p_raw) < 0.05 else "ns"
+    p = p_raw if p_adj is None else p_adj
+    sig = _SIG_LABELS[np.searchsorted(_SIG_LEVELS, p, side="right")]
     print(f"\n  {name}")
     print(f"    {stat_name} = {stat_val:.4f}")
     print(f"    p (raw)      = {p_raw:.6f}")
@@ -103,46 +195,95 @@ def main():
         if not baseline_file:
             print("WARNING: No LLM baseline file found. Tests 2-3 will be skipped.")
 
+    results_basename = os.path.basename(results_file)
+    baseline_basename = os.path.basename(baseline_file) if baseline_file else None
+    stats_basename = f"circularity-stats-{results_basename.removeprefix('circularity-results-').removesuffix('.json')}.json"
+
     print_separator()
     print("SELF-RATING CIRCULARITY EXPERIMENT — STATISTICAL ANALYSIS")
     print(f"Pre-registration: 2026-02-09")
-    print(f"Results file: {os.path.basename(results_file)}")
-    if baseline_file:
-        print(f"Baseline file: {os.path.basename(baseline_file)}")
+    print(f"Results file: {results_basename}")
+    if baseline_basename:
+        print(f"Baseline file: {baseline_basename}")
     print_separator()
 
     # ─── Load data ───────────────────────────────────────────────
-    with open(results_file, "r") as f:
-        data = json.load(f)
+    data = load_json(results_file)
 
     cases = data["cases"]
     aggregated = data["summary"]["aggregatedByCase"]
+    per_domain = data["summary"]["perDomain"]
     n_cases = len(cases)
     n_agg = len(aggregated)
+    agg_labels = [a["testCaseLabel"] for a in aggregated]
+    agg_label_set = set(agg_labels)
 
     print(f"\n  N (individual cases) = {n_cases}")
     print(f"  N (aggregated cases) = {n_agg}")
 
     # Load baseline for Tests 2-3
     baseline_results = None
+    has_baseline = False
     if baseline_file:
-        with open(baseline_file, "r") as f:
-            baseline_data = json.load(f)
-        baseline_results = {r["label"]: r for r in baseline_data["results"]}
-        print(f"  Baseline cases loaded = {len(baseline_results)}")
+        baseline_data = load_json(baseline_file)
+        has_baseline = bool(baseline_data["results"])
+        # Label -> exact-match flag (last row wins for repeated labels); the
+        # summary counts use the whole file, pairing only the aggregated labels
+        all_exact = {r["label"]: r["exact"] for r in baseline_data["results"]}
+        llm_human_exact = sum(1 for exact in all_exact.values() if exact)
+        baseline_results = {label: exact for label, exact in all_exact.items()
+                            if label in agg_label_set}
+        print(f"  Baseline cases loaded = {len(all_exact)}")
+        del baseline_data
+
+    # Ablation data (per-case SSR on human text) for Test 3 and E4
+    ablation_data = h3_cond = ablation_error = None
+    ablation_file = find_latest_file(data_dir, "ablation-v2-")
+    if ablation_file:
+        try:
+            ablation_data = load_json(ablation_file)
+        except (OSError, ValueError) as e:  # I/O or JSON decode failure
+            ablation_error = f"Could not load ablation data: {e}"
+            print(f"WARNING: {ablation_error}")
+        else:
+            h3_cond = _find_h3(ablation_data)
 
     # ─── Extract arrays ──────────────────────────────────────────
-    llm_ratings = np.array([c["llmRating"] for c in cases])
-    ssr_ratings = np.array([c["ssrRating"] for c in cases])
-    targets = np.array([c["targetRating"] for c in cases])
+    # Single C-level pass over cases into one pre-sized record array;
+    # the per-field arrays below are views into it.
+    case_records = np.fromiter(
+        ((c["llmRating"], c["ssrRating"], c["targetRating"], c["ssrConfidence"],
+          c["personaId"], c["domain"]) for c in cases),
+        dtype=CASE_DTYPE, count=n_cases,
+    )
+    llm_ratings = case_records["llmRating"]
+    ssr_ratings = case_records["ssrRating"]
+    targets = case_records["targetRating"]
+    ssr_conf = case_records["ssrConfidence"]
+    persona_ids = case_records["personaId"]
+    domains = case_records["domain"]
+
+    # Everything downstream reads the extracted arrays; release the raw cases
+    # (they carry the generated texts and SSR distributions)
+    del cases, data
 
     llm_errors = llm_ratings - targets  # signed errors
     ssr_errors = ssr_ratings - targets
     rating_diffs = llm_ratings - ssr_ratings  # LLM - SSR
+    abs_llm_err = np.abs(llm_errors)
+    abs_ssr_err = np.abs(ssr_errors)
+    abs_div = np.abs(rating_diffs)  # |LLM - SSR|
+
+    # Descriptive moments, computed once and reused in the saved output
+    llm_mean = float(llm_ratings.mean())
+    ssr_mean = float(ssr_ratings.mean())
+    target_mean = float(targets.mean())
+    diff_mean = float(rating_diffs.mean())
+    diff_sd = float(rating_diffs.std())
 
-    print(f"\n  LLM mean rating: {llm_ratings.mean():.3f} (SD={llm_ratings.std():.3f})")
-    print(f"  SSR mean rating: {ssr_ratings.mean():.3f} (SD={ssr_ratings.std():.3f})")
-    print(f"  Target mean:     {targets.mean():.3f} (SD={targets.std():.3f})")
+    print(f"\n  LLM mean rating: {llm_mean:.3f} (SD={llm_ratings.std():.3f})")
+    print(f"  SSR mean rating: {ssr_mean:.3f} (SD={ssr_ratings.std():.3f})")
+    print(f"  Target mean:     {target_mean:.3f} (SD={targets.std():.3f})")
 
     # ═══════════════════════════════════════════════════════════════
     # CONFIRMATORY TESTS
@@ -158,10 +299,13 @@ def main():
 
     # ─── Test 1: Wilcoxon signed-rank (rating divergence) ────────
     # H0: median(LLM_rating - SSR_rating) = 0
-    nonzero_diffs = rating_diffs[rating_diffs != 0]
-    if len(nonzero_diffs) > 0:
-        w1_stat, w1_p = stats.wilcoxon(rating_diffs, alternative="two-sided")
-        r1 = rank_biserial(w1_stat, len(nonzero_diffs))
+    # Normal approximation with zeros dropped ("wilcox"), fixed in advance per
+    # the pre-registration rather than left to scipy's automatic selection
+    n_nonzero_1 = int(np.count_nonzero(rating_diffs))
+    if n_nonzero_1 > 0:
+        w1_stat, w1_p = stats.wilcoxon(rating_diffs, alternative="two-sided",
+                                       method="approx", zero_method="wilcox")
+        r1 = rank_biserial(w1_stat, n_nonzero_1)
     else:
         w1_stat, w1_p, r1 = 0.0, 1.0, 0.0
 
@@ -170,46 +314,29 @@ def main():
     test_results_data.append({
         "test": "Wilcoxon signed-rank",
         "hypothesis": "H0: median(LLM - SSR) = 0",
-        "W": float(w1_stat), "p_raw": float(w1_p),
-        "rank_biserial_r": float(r1),
-        "n_nonzero": int(len(nonzero_diffs)),
-        "mean_diff": float(rating_diffs.mean()),
-        "sd_diff": float(rating_diffs.std()),
+        "W": w1_stat, "p_raw": w1_p,
+        "rank_biserial_r": r1,
+        "n_nonzero": n_nonzero_1,
+        "mean_diff": diff_mean,
+        "sd_diff": diff_sd,
     })
 
     # ─── Test 2: McNemar (LLM auto-accuracy vs LLM on human) ────
-    if baseline_results and HAS_STATSMODELS:
+    if has_baseline and HAS_STATSMODELS:
         # Build 2×2 contingency table
         # Rows: LLM on generated (correct/incorrect)
         # Cols: LLM on human (correct/incorrect)
-        a_both_correct = 0  # Both correct
-        b_gen_correct_human_wrong = 0  # Generated correct, human wrong
-        c_gen_wrong_human_correct = 0  # Generated wrong, human correct
-        d_both_wrong = 0  # Both wrong
-
-        for agg in aggregated:
-            label = agg["testCaseLabel"]
-            llm_auto_correct = agg["llmExactMatch"]
-            if label in baseline_results:
-                llm_human_correct = baseline_results[label]["exact"]
-                if llm_auto_correct and llm_human_correct:
-                    a_both_correct += 1
-                elif llm_auto_correct and not llm_human_correct:
-                    b_gen_correct_human_wrong += 1
-                elif not llm_auto_correct and llm_human_correct:
-                    c_gen_wrong_human_correct += 1
-                else:
-                    d_both_wrong += 1
-
-        contingency_2 = np.array([[a_both_correct, b_gen_correct_human_wrong],
-                                   [c_gen_wrong_human_correct, d_both_wrong]])
+        present = np.array([label in baseline_results for label in agg_labels], dtype=bool)
+        llm_auto = np.fromiter((a["llmExactMatch"] for a in aggregated), dtype=bool, count=n_agg)[present]
+        llm_human = np.array([baseline_results[label] for label in agg_labels
+                              if label in baseline_results], dtype=bool)
+        contingency_2 = paired_contingency(llm_auto, llm_human)
 
         # McNemar uses the off-diagonal cells
-        b = b_gen_correct_human_wrong
-        c = c_gen_wrong_human_correct
+        b = contingency_2[0, 1]  # Generated correct, human wrong
+        c = contingency_2[1, 0]  # Generated wrong, human correct
 
         if b + c > 0:
-            from statsmodels.stats.contingency_tables import mcnemar as mcnemar_test
             result_mc2 = mcnemar_test(contingency_2, exact=(b + c < 25))
             mcnemar2_p = result_mc2.pvalue
             mcnemar2_stat = result_mc2.statistic
@@ -224,12 +351,12 @@ def main():
         test_results_data.append({
             "test": "McNemar",
             "hypothesis": "H0: LLM accuracy on own text = LLM accuracy on human text",
-            "contingency": contingency_2.tolist(),
-            "b_discordant": int(b), "c_discordant": int(c),
-            "statistic": float(mcnemar2_stat), "p_raw": float(mcnemar2_p),
-            "odds_ratio": float(odds_ratio_2),
+            "contingency": contingency_2,
+            "b_discordant": b, "c_discordant": c,
+            "statistic": float(mcnemar2_stat), "p_raw": mcnemar2_p,
+            "odds_ratio": odds_ratio_2,
             "llm_auto_exact": int(sum(1 for a in aggregated if a["llmExactMatch"])),
-            "llm_human_exact": int(sum(1 for r in baseline_results.values() if r["exact"])),
+            "llm_human_exact": llm_human_exact,
         })
     else:
         raw_pvalues.append(1.0)
@@ -249,47 +376,31 @@ def main():
         # For now, we'll mark this test as requiring additional data.
 
         # Actually, let's try to find ablation data which has per-case SSR predictions
-        ablation_file = find_latest_file(data_dir, "ablation-v2-")
-        if ablation_file:
-            with open(ablation_file, "r") as f:
-                ablation_data = json.load(f)
-
+        if ablation_data:
             # Find H3 (asymmetric) results which match our SSR config
             h3_results = None
-            # Ablation v2 uses "conditions" with "details" per case
-            for cond in ablation_data.get("conditions", ablation_data.get("variants", [])):
-                name = cond.get("name", "")
-                if "H3" in name or "asymm" in name.lower() or "asymmetric" in name.lower():
-                    h3_results = cond.get("details", cond.get("perCase", cond.get("results", [])))
-                    break
+            if h3_cond:
+                h3_results = h3_cond.get("details", h3_cond.get("perCase", h3_cond.get("results", [])))
 
             if h3_results and isinstance(h3_results, list):
                 ssr_human_by_label = {}
                 for r in h3_results:
                     label = r.get("label", r.get("testCaseLabel", ""))
+                    if label not in agg_label_set:
+                        continue
                     expected = r.get("expected", r.get("targetRating", 0))
                     predicted = r.get("predicted", r.get("ssrRating", 0))
                     ssr_human_by_label[label] = (predicted == expected)
 
                 # Build contingency table
-                a3 = b3 = c3 = d3 = 0
-                for agg in aggregated:
-                    label = agg["testCaseLabel"]
-                    ssr_gen_correct = agg["ssrExactMatch"]
-                    if label in ssr_human_by_label:
-                        ssr_human_correct = ssr_human_by_label[label]
-                        if ssr_gen_correct and ssr_human_correct:
-                            a3 += 1
-                        elif ssr_gen_correct and not ssr_human_correct:
-                            b3 += 1
-                        elif not ssr_gen_correct and ssr_human_correct:
-                            c3 += 1
-                        else:
-                            d3 += 1
-
-                contingency_3 = np.array([[a3, b3], [c3, d3]])
+                present = np.array([label in ssr_human_by_label for label in agg_labels], dtype=bool)
+                ssr_gen = np.fromiter((a["ssrExactMatch"] for a in aggregated), dtype=bool, count=n_agg)[present]
+                ssr_human = np.array([ssr_human_by_label[label] for label in agg_labels
+                                      if label in ssr_human_by_label], dtype=bool)
+                contingency_3 = paired_contingency(ssr_gen, ssr_human)
+                b3 = contingency_3[0, 1]
+                c3 = contingency_3[1, 0]
                 if b3 + c3 > 0:
-                    from statsmodels.stats.contingency_tables import mcnemar as mcnemar_test
                     result_mc3 = mcnemar_test(contingency_3, exact=(b3 + c3 < 25))
                     mcnemar3_p = result_mc3.pvalue
                     mcnemar3_stat = result_mc3.statistic
@@ -304,10 +415,10 @@ def main():
                 test_results_data.append({
                     "test": "McNemar",
                     "hypothesis": "H0: SSR accuracy on generated text = SSR accuracy on human text",
-                    "contingency": contingency_3.tolist(),
-                    "b_discordant": int(b3), "c_discordant": int(c3),
-                    "statistic": float(mcnemar3_stat), "p_raw": float(mcnemar3_p),
-                    "odds_ratio": float(odds_ratio_3),
+                    "contingency": contingency_3,
+                    "b_discordant": b3, "c_discordant": c3,
+                    "statistic": float(mcnemar3_stat), "p_raw": mcnemar3_p,
+                    "odds_ratio": odds_ratio_3,
                     "ssr_gen_exact": int(sum(1 for a in aggregated if a["ssrExactMatch"])),
                 })
             else:
@@ -318,19 +429,29 @@ def main():
         else:
             raw_pvalues.append(1.0)
             test_names.append("Test 3: SSR generated vs human (SKIPPED - no ablation data)")
-            test_results_data.append({"test": "McNemar", "skipped": True})
+            skipped_3 = {"test": "McNemar", "skipped": True}
+            if ablation_error:
+                skipped_3["reason"] = ablation_error
+            test_results_data.append(skipped_3)
     else:
         raw_pvalues.append(1.0)
         test_names.append("Test 3: SSR generated vs human (SKIPPED)")
         test_results_data.append({"test": "McNemar", "skipped": True})
 
+    # Error variances shared by Tests 4 and 5
+    llm_var = float(np.var(llm_errors))
+    ssr_var = float(np.var(ssr_errors))
+    llm_sd = math.sqrt(llm_var)
+    ssr_sd = math.sqrt(ssr_var)
+
     # ─── Test 4: Wilcoxon on signed errors ───────────────────────
     # H0: mean(LLM_error) = mean(SSR_error), where error = rating - target
     paired_error_diffs = llm_errors - ssr_errors
-    nonzero_err_diffs = paired_error_diffs[paired_error_diffs != 0]
-    if len(nonzero_err_diffs) > 0:
-        w4_stat, w4_p = stats.wilcoxon(paired_error_diffs, alternative="two-sided")
-        r4 = rank_biserial(w4_stat, len(nonzero_err_diffs))
+    n_nonzero_4 = int(np.count_nonzero(paired_error_diffs))
+    if n_nonzero_4 > 0:
+        w4_stat, w4_p = stats.wilcoxon(paired_error_diffs, alternative="two-sided",
+                                       method="approx", zero_method="wilcox")
+        r4 = rank_biserial(w4_stat, n_nonzero_4)
     else:
         w4_stat, w4_p, r4 = 0.0, 1.0, 0.0
 
@@ -339,39 +460,39 @@ def main():
     test_results_data.append({
         "test": "Wilcoxon signed-rank",
         "hypothesis": "H0: mean(LLM_error) = mean(SSR_error)",
-        "W": float(w4_stat), "p_raw": float(w4_p),
-        "rank_biserial_r": float(r4),
-        "n_nonzero": int(len(nonzero_err_diffs)),
-        "llm_mean_error": float(llm_errors.mean()),
-        "ssr_mean_error": float(ssr_errors.mean()),
-        "llm_sd_error": float(llm_errors.std()),
-        "ssr_sd_error": float(ssr_errors.std()),
+        "W": w4_stat, "p_raw": w4_p,
+        "rank_biserial_r": r4,
+        "n_nonzero": n_nonzero_4,
+        "llm_mean_error": llm_errors.mean(),
+        "ssr_mean_error": ssr_errors.mean(),
+        "llm_sd_error": llm_sd,
+        "ssr_sd_error": ssr_sd,
     })
 
     # ─── Test 5: Levene (variance compression) ───────────────────
     # H0: var(LLM_errors) = var(SSR_errors)
     f5_stat, f5_p = stats.levene(llm_errors, ssr_errors, center="median")
-    var_ratio = float(np.var(llm_errors)) / float(np.var(ssr_errors)) if np.var(ssr_errors) > 0 else float('inf')
+    var_ratio = llm_var / ssr_var if ssr_var > 0 else float('inf')
 
     raw_pvalues.append(f5_p)
     test_names.append("Test 5: Variance compression (Levene)")
     test_results_data.append({
         "test": "Levene",
         "hypothesis": "H0: var(LLM_errors) = var(SSR_errors)",
-        "F": float(f5_stat), "p_raw": float(f5_p),
-        "variance_ratio": float(var_ratio),
-        "llm_var": float(np.var(llm_errors)),
-        "ssr_var": float(np.var(ssr_errors)),
-        "llm_sd": float(np.std(llm_errors)),
-        "ssr_sd": float(np.std(ssr_errors)),
+        "F": f5_stat, "p_raw": f5_p,
+        "variance_ratio": var_ratio,
+        "llm_var": llm_var,
+        "ssr_var": ssr_var,
+        "llm_sd": llm_sd,
+        "ssr_sd": ssr_sd,
     })
 
     # ─── Holm-Bonferroni correction ──────────────────────────────
     if HAS_STATSMODELS:
         reject_arr, corrected_p, _, _ = multipletests(raw_pvalues, method="holm")
         for i, td in enumerate(test_results_data):
-            td["p_adjusted"] = float(corrected_p[i])
-            td["reject_h0"] = bool(reject_arr[i])
+            td["p_adjusted"] = corrected_p[i]
+            td["reject_h0"] = reject_arr[i]
     else:
         corrected_p = raw_pvalues
         reject_arr = [p < 0.05 for p in raw_pvalues]
@@ -423,11 +544,12 @@ def main():
     print("\n  E1: Persona × Method Interaction")
     print("  " + "-" * 55)
 
-    persona_groups = defaultdict(list)
-    for c in cases:
-        persona_groups[c["personaId"]].append(abs(c["llmRating"] - c["ssrRating"]))
+    # Group |LLM - SSR| by persona (sorted by persona id)
+    persona_grouped = pd.Series(abs_div, index=persona_ids).groupby(level=0, sort=True)
+    persona_table = persona_grouped.agg(["mean", "median", "size"])
 
-    groups = [np.array(persona_groups[pid]) for pid in sorted(persona_groups.keys())]
+    groups = [g.to_numpy() for _, g in persona_grouped]
+    kw_stat, kw_p = None, None
     if len(groups) >= 2:
         kw_stat, kw_p = stats.kruskal(*groups)
         print(f"  Kruskal-Wallis H = {kw_stat:.4f}, p = {kw_p:.6f}")
@@ -436,9 +558,8 @@ def main():
 
     print(f"\n  {'Persona':<25} {'Mean |div|':<12} {'Median |div|':<12} {'N':<5}")
     print("  " + "-" * 55)
-    for pid in sorted(persona_groups.keys()):
-        arr = np.array(persona_groups[pid])
-        print(f"  {pid:<25} {arr.mean():<12.3f} {np.median(arr):<12.1f} {len(arr):<5}")
+    for pid, mean_div, median_div, n in persona_table.itertuples():
+        print(f"  {pid:<25} {mean_div:<12.3f} {median_div:<12.1f} {n:<5}")
 
     # ─── E2: Per-domain divergence table ─────────────────────────
     print("\n  E2: Per-Domain Divergence")
@@ -446,11 +567,9 @@ def main():
     print(f"  {'Domain':<18} {'LLM exact%':<12} {'SSR exact%':<12} {'Mean div':<10} {'N':<5}")
     print("  " + "-" * 65)
 
-    per_domain = data["summary"]["perDomain"]
     for domain in sorted(per_domain.keys()):
         dm = per_domain[domain]
-        domain_cases = [c for c in cases if c["domain"] == domain]
-        n_domain = len(domain_cases)
+        n_domain = int(np.count_nonzero(domains == domain))
         print(f"  {domain:<18} {dm['llmExact']:<12} {dm['ssrExact']:<12} {dm['meanDivergence']:<10.3f} {n_domain:<5}")
 
     # ─── E3: Signed error by target rating level ─────────────────
@@ -459,50 +578,53 @@ def main():
     print(f"  {'Rating':<8} {'LLM mean err':<14} {'SSR mean err':<14} {'LLM SD':<10} {'SSR SD':<10} {'N':<5}")
     print("  " + "-" * 65)
 
-    for target in range(1, 6):
-        mask = targets == target
-        if mask.sum() == 0:
-            continue
-        llm_e = llm_errors[mask]
-        ssr_e = ssr_errors[mask]
-        print(f"  {target:<8} {llm_e.mean():<14.3f} {ssr_e.mean():<14.3f} {llm_e.std():<10.3f} {ssr_e.std():<10.3f} {mask.sum():<5}")
+    # Sort once by target; each rating level is then a contiguous run
+    target_order = np.argsort(targets, kind="stable")
+    t_sorted = targets[target_order]
+    lo = np.searchsorted(t_sorted, 1, side="left")
+    hi = np.searchsorted(t_sorted, 5, side="right")
+    level_idx = target_order[lo:hi]
+    level_counts = np.bincount(t_sorted[lo:hi] - 1, minlength=5)
+    levels = np.arange(1, 6)[level_counts > 0]
+    level_counts = level_counts[level_counts > 0]
+    level_offsets = np.cumsum(level_counts) - level_counts
+    llm_level_mean, llm_level_sd = group_mean_sd(llm_errors[level_idx], level_offsets, level_counts)
+    ssr_level_mean, ssr_level_sd = group_mean_sd(ssr_errors[level_idx], level_offsets, level_counts)
+
+    for i, target in enumerate(levels):
+        print(f"  {target:<8} {llm_level_mean[i]:<14.3f} {ssr_level_mean[i]:<14.3f} {llm_level_sd[i]:<10.3f} {ssr_level_sd[i]:<10.3f} {level_counts[i]:<5}")
 
     # ─── E4: SSR confidence comparison ───────────────────────────
     print("\n  E4: SSR Confidence on Generated vs Human Text")
     print("  " + "-" * 55)
 
-    ssr_gen_conf = np.array([c["ssrConfidence"] for c in cases])
-    print(f"  Generated text: mean={ssr_gen_conf.mean():.3f}, SD={ssr_gen_conf.std():.3f}, median={np.median(ssr_gen_conf):.3f}")
+    print(f"  Generated text: mean={ssr_conf.mean():.3f}, SD={ssr_conf.std():.3f}, median={np.median(ssr_conf):.3f}")
 
     # If we have human SSR confidence data from ablation
-    if ablation_file:
+    if h3_cond:
         try:
-            with open(ablation_file, "r") as f:
-                ablation_data = json.load(f)
             # Try to extract confidence from H3 variant
-            for cond in ablation_data.get("conditions", ablation_data.get("variants", [])):
-                name = cond.get("name", "")
-                if "H3" in name or "asymm" in name.lower() or "asymmetric" in name.lower():
-                    h3_cases = cond.get("details", cond.get("perCase", []))
-                    if h3_cases:
-                        human_confs = [r.get("confidence", 0) for r in h3_cases if "confidence" in r]
-                        if human_confs:
-                            human_conf_arr = np.array(human_confs)
-                            print(f"  Human text:     mean={human_conf_arr.mean():.3f}, SD={human_conf_arr.std():.3f}, median={np.median(human_conf_arr):.3f}")
-                            # Mann-Whitney U test
-                            u_stat, u_p = stats.mannwhitneyu(ssr_gen_conf, human_conf_arr, alternative="two-sided")
-                            print(f"  Mann-Whitney U = {u_stat:.1f}, p = {u_p:.6f}")
-                    break
+            h3_cases = h3_cond.get("details", h3_cond.get("perCase", []))
+            human_confs = [r.get("confidence", 0) for r in h3_cases if "confidence" in r]
+            if human_confs:
+                human_conf_arr = np.array(human_confs)
+                print(f"  Human text:     mean={human_conf_arr.mean():.3f}, SD={human_conf_arr.std():.3f}, median={np.median(human_conf_arr):.3f}")
+                # Mann-Whitney U test
+                u_stat, u_p = stats.mannwhitneyu(ssr_conf, human_conf_arr, alternative="two-sided")
+                print(f"  Mann-Whitney U = {u_stat:.1f}, p = {u_p:.6f}")
         except Exception as e:
             print(f"  Could not load human SSR confidence: {e}")
 
     # ═══════════════════════════════════════════════════════════════
     # SAVE COMPLETE STATISTICAL RESULTS
     # ═══════════════════════════════════════════════════════════════
+    def pct(mask: np.ndarray) -> float:
+        return np.count_nonzero(mask) / n_cases * 100
+
     stats_output = {
         "preRegistrationDate": "2026-02-09",
-        "resultsFile": os.path.basename(results_file),
-        "baselineFile": os.path.basename(baseline_file) if baseline_file else None,
+        "resultsFile": results_basename,
+        "baselineFile": baseline_basename,
         "nCases": n_cases,
         "nAggregated": n_agg,
         "confirmatoryTests": test_results_data,
@@ -511,40 +633,39 @@ def main():
         "alphaLevel": 0.05,
         "correction": "Holm-Bonferroni",
         "descriptive": {
-            "llm_mean_rating": float(llm_ratings.mean()),
-            "ssr_mean_rating": float(ssr_ratings.mean()),
-            "target_mean": float(targets.mean()),
-            "rating_diff_mean": float(rating_diffs.mean()),
-            "rating_diff_sd": float(rating_diffs.std()),
-            "rating_diff_median": float(np.median(rating_diffs)),
-            "llm_exact_pct": float((np.sum(llm_errors == 0) / n_cases) * 100),
-            "ssr_exact_pct": float((np.sum(ssr_errors == 0) / n_cases) * 100),
-            "llm_within1_pct": float((np.sum(np.abs(llm_errors) <= 1) / n_cases) * 100),
-            "ssr_within1_pct": float((np.sum(np.abs(ssr_errors) <= 1) / n_cases) * 100),
-            "llm_mae": float(np.abs(llm_errors).mean()),
-            "ssr_mae": float(np.abs(ssr_errors).mean()),
+            "llm_mean_rating": llm_mean,
+            "ssr_mean_rating": ssr_mean,
+            "target_mean": target_mean,
+            "rating_diff_mean": diff_mean,
+            "rating_diff_sd": diff_sd,
+            "rating_diff_median": np.median(rating_diffs),
+            "llm_exact_pct": pct(llm_errors == 0),
+            "ssr_exact_pct": pct(ssr_errors == 0),
+            "llm_within1_pct": pct(abs_llm_err <= 1),
+            "ssr_within1_pct": pct(abs_ssr_err <= 1),
+            "llm_mae": abs_llm_err.mean(),
+            "ssr_mae": abs_ssr_err.mean(),
         },
         "exploratory": {
             "kruskal_wallis_persona": {
-                "H": float(kw_stat) if 'kw_stat' in dir() else None,
-                "p": float(kw_p) if 'kw_p' in dir() else None,
+                "H": kw_stat,
+                "p": kw_p,
             },
             "per_target_rating": {
                 str(t): {
-                    "llm_mean_error": float(llm_errors[targets == t].mean()),
-                    "ssr_mean_error": float(ssr_errors[targets == t].mean()),
-                    "n": int((targets == t).sum()),
+                    "llm_mean_error": llm_level_mean[i],
+                    "ssr_mean_error": ssr_level_mean[i],
+                    "n": level_counts[i],
                 }
-                for t in range(1, 6) if (targets == t).sum() > 0
+                for i, t in enumerate(levels)
             },
         },
     }
 
-    stats_path = os.path.join(data_dir, f"circularity-stats-{os.path.basename(results_file).replace('circularity-results-', '').replace('.json', '')}.json")
-    with open(stats_path, "w") as f:
-        json.dump(stats_output, f, indent=2)
+    stats_path = os.path.join(data_dir, stats_basename)
+    dump_json(stats_output, stats_path)
 
-    print(f"\n  Statistical results saved to: {os.path.basename(stats_path)}")
+    print(f"\n  Statistical results saved to: {stats_basename}")
 
     # ═══════════════════════════════════════════════════════════════
     # SCENARIO DETERMINATION